@@ -1,41 +1,351 @@
 import os
 import json
+import mmap
+import hashlib
+import shutil
+import zlib
 import zipfile
+import msgspec
 import requests
+import posixpath
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 from loguru import logger
-from typing import Dict, Any
+from fnmatch import fnmatch
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
+
+class _IsalInflateZlib:
+    """zlib stand-in for zipfile using ISA-L for inflate and crc32 only"""
+
+    def __init__(self, isal_module: Any):
+        self.decompressobj = isal_module.decompressobj
+        self.crc32 = isal_module.crc32
+
+    def __getattr__(self, name: str) -> Any:
+        # Compression stays on stdlib zlib, which supports every level
+        return getattr(zlib, name)
+
+
+if isal_zlib is not None:
+    # ISA-L's SIMD inflate replaces the decompression zipfile does, writers
+    # keep stdlib deflate
+    zipfile.zlib = _IsalInflateZlib(isal_zlib)
+    zipfile.crc32 = isal_zlib.crc32
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj: Any, path: Path) -> None:
+    """Write obj as indented JSON, using orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+
+def _load_json(path: Path) -> Any:
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class _DialogueSummary(msgspec.Struct, gc=False):
+    """Fields verify_dataset reads from a dialogue, the decoder skips the rest"""
+    services: List[str] = []
+
+
+_DIALOGUE_SUMMARY_DECODER = msgspec.json.Decoder(List[_DialogueSummary])
+
+
+def _dump_split(split_data: Any, split_dir: Path) -> None:
+    """Write one HuggingFace split as dialogues_001.json and .parquet"""
+    # Export rows to Python in one pass over the Arrow table
+    conversations = split_data.to_list()
+
+    # Save as dialogues_001.json
+    output_file = split_dir / "dialogues_001.json"
+    _dump_json(conversations, output_file)
+    split_data.to_parquet(
+        str(output_file.with_suffix(".parquet")), compression="zstd")
+
+    logger.info(
+        f"Saved {len(conversations)} conversations to {output_file}")
+
+
+def _scan_dialogue_files(directory: Path) -> List[Path]:
+    """List dialogues_*.json in directory using scandir's cached entry types"""
+    with os.scandir(directory) as entries:
+        return [Path(entry.path) for entry in entries
+                if entry.name.startswith("dialogues_")
+                and entry.name.endswith(".json")
+                and entry.is_file()]
+
+
+def _prefetch(paths: List[Path]) -> None:
+    """Ask the kernel to start reading all paths so their I/O overlaps parsing"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _file_sha256(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _write_all(f: Any, data: bytes) -> None:
+    # Unbuffered files may accept only part of a write
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+class _ProgressWriter:
+    """Write-only file object that reports progress every `tick` bytes"""
+
+    def __init__(self, write: Callable[[bytes], Any], pbar: tqdm, tick: int = 32 << 20):
+        self._write = write
+        self._pbar = pbar
+        self._tick = tick
+        self._pending = 0
+        self.written = 0
+
+    def __enter__(self) -> "_ProgressWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def write(self, data: bytes) -> int:
+        self._write(data)
+        self._pending += len(data)
+        self.written += len(data)
+        if self._pending >= self._tick:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        self._pbar.update(self._pending)
+        self._pending = 0
 
 
 class MultiWOZDownloader:
     MULTIWOZ_URL = "https://github.com/budzianowski/multiwoz/raw/master/data/MultiWOZ_2.2.zip"
+    # Known-good SHA-256 of the archive. No digest is pinned yet, so downloads
+    # are not verified until this is set
+    MULTIWOZ_SHA256: Optional[str] = None
+    DOWNLOAD_WORKERS = 8
+    # Archive members needed downstream, matched against the file name
+    EXTRACT_PATTERNS = ("dialogues_*.json", "schema.json", "dialog_acts.json")
+    VERIFY_CACHE = ".cauiq_verify.json"
 
     def __init__(self, data_dir: str = "../data/raw"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
-    def download_file(self, url: str, destination: Path) -> None:
+        # Reuse pooled keep-alive connections across downloads and retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "MultiWOZDownloader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def download_file(self, url: str, destination: Path, expected_sha256: Optional[str] = None) -> None:
         logger.info(f"Downloading MultiWOZ dataset from {url}...")
-        response = requests.get(url, stream=True, timeout=30)
+        # A failed HEAD or missing size only rules out ranged downloads
+        range_url, total_size, accepts_ranges = url, 0, False
+        try:
+            head = self.session.head(
+                url, allow_redirects=True, timeout=(10, 60))
+            head.raise_for_status()
+            range_url = head.url
+            total_size = int(head.headers.get('content-length', 0))
+            accepts_ranges = head.headers.get(
+                'accept-ranges', '').lower() == 'bytes'
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"HEAD request failed, using a single stream: {e}")
+
+        # Write to a .part file so an interrupted download never leaves
+        # something that looks like a complete archive
+        part_path = destination.with_name(destination.name + ".part")
+        try:
+            # Fetch byte ranges in parallel when the server advertises them,
+            # falling back to a single stream if it still ignores Range
+            if (total_size and accepts_ranges
+                    and self._download_ranges(range_url, part_path, total_size)):
+                # SHA-256 cannot be combined across ranges that land out of
+                # order, so the assembled file is re-read once to hash it
+                digest = _file_sha256(part_path)
+            else:
+                if total_size:
+                    logger.warning(
+                        "Server does not support range requests, using a single stream")
+                digest = self._download_stream(url, part_path)
+
+            logger.info(f"SHA-256: {digest}")
+            if not expected_sha256:
+                logger.warning(
+                    f"No expected SHA-256 for {url}, download is unverified")
+            elif digest != expected_sha256.lower():
+                raise IOError(
+                    f"Checksum mismatch for {destination}: expected {expected_sha256}, got {digest}")
+            os.replace(part_path, destination)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+        logger.info(f"Downloaded to {destination}")
+
+    def _download_stream(self, url: str, destination: Path) -> str:
+        """Stream url to destination, returns the SHA-256 hex digest of the body"""
+        response = self.session.get(url, stream=True, timeout=(10, 60))
         response.raise_for_status()
         total_size = int(response.headers.get('content-length', 0))
-        with open(destination, 'wb') as f:
+        sha256 = hashlib.sha256()
+        # Chunks are already large, so skip Python's write buffer
+        with open(destination, 'wb', buffering=0) as f:
+            def write(data: bytes) -> None:
+                sha256.update(data)
+                _write_all(f, data)
+
+            with tqdm(total=total_size, unit='B', unit_scale=True, desc="Downloading") as pbar:
+                response.raw.decode_content = True
+                with _ProgressWriter(write, pbar) as sink:
+                    shutil.copyfileobj(response.raw, sink, 1 << 20)
+        return sha256.hexdigest()
+
+    def _download_ranges(self, url: str, destination: Path, total_size: int) -> bool:
+        """Download url as parallel byte ranges, returns False if ranges are unsupported"""
+        part_size = -(-total_size // self.DOWNLOAD_WORKERS)
+        ranges = [(start, min(start + part_size, total_size) - 1)
+                  for start in range(0, total_size, part_size)]
+
+        fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, total_size)
             with tqdm(total=total_size, unit='B', unit_scale=True, desc="Downloading") as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        pbar.update(len(chunk))
+                with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                    futures = [
+                        executor.submit(self._download_range,
+                                        url, fd, start, end, pbar)
+                        for start, end in ranges
+                    ]
+                    # Wait for every range so no worker's error goes unreported
+                    results, errors = [], []
+                    for future in futures:
+                        try:
+                            results.append(future.result())
+                        except Exception as e:
+                            errors.append(e)
+            for e in errors[1:]:
+                logger.error(f"Range download failed: {e}")
+            if errors:
+                raise errors[0]
+            return all(results)
+        finally:
+            os.close(fd)
+
+    def _download_range(self, url: str, fd: int, start: int, end: int, pbar: tqdm) -> bool:
+        # Range offsets refer to the encoded body, so ask for it unencoded
+        response = self.session.get(
+            url, headers={"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"},
+            stream=True, timeout=(10, 60))
+        with response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                return False
 
-        logger.info(f"Downloaded to {destination}")
+            offset = start
+
+            def write_at_offset(data: bytes) -> None:
+                nonlocal offset
+                _pwrite_all(fd, data, offset)
+                offset += len(data)
+
+            response.raw.decode_content = False
+            with _ProgressWriter(write_at_offset, pbar) as sink:
+                shutil.copyfileobj(response.raw, sink, 1 << 20)
+
+        if offset != end + 1:
+            raise IOError(
+                f"Incomplete range {start}-{end}: received {offset - start} bytes")
+        return True
 
     def extract_zip(self, zip_path: Path, extract_dir: Path) -> None:
         logger.info(f"Extracting {zip_path}")
 
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-
-        logger.info(f"Extracted to {extract_dir}")
+            members = []
+            for info in zip_ref.infolist():
+                name = posixpath.basename(info.filename)
+                if info.is_dir() or not any(
+                        fnmatch(name, pattern) for pattern in self.EXTRACT_PATTERNS):
+                    continue
+                target = self._member_path(extract_dir, info.filename)
+                # Create parents up front so workers never race on mkdir
+                target.parent.mkdir(parents=True, exist_ok=True)
+                members.append((info, target))
+
+            # Entries inflate independently and zlib releases the GIL
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(
+                    lambda member: self._extract_member(zip_ref, *member), members))
+
+        logger.info(f"Extracted {len(members)} files to {extract_dir}")
 
         # Handle nested "data/" directory structure
         data_subdir = extract_dir / "data"
@@ -50,6 +360,18 @@ class MultiWOZDownloader:
             data_subdir.rmdir()
             logger.info(" Restructured to flat directory")
 
+    @staticmethod
+    def _member_path(extract_dir: Path, filename: str) -> Path:
+        target = (extract_dir / filename).resolve()
+        if not target.is_relative_to(extract_dir.resolve()):
+            raise ValueError(f"Unsafe path in archive: {filename}")
+        return target
+
+    @staticmethod
+    def _extract_member(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path) -> None:
+        with zip_ref.open(info) as source, open(target, 'wb') as dest:
+            shutil.copyfileobj(source, dest, 1 << 20)
+
     def download_multiwoz(self) -> Path:
         zip_path = self.data_dir / "MultiWOZ_2.2.zip"
         extract_dir = self.data_dir / "multiwoz_2.2"
@@ -62,7 +384,8 @@ class MultiWOZDownloader:
         # Download
         if not zip_path.exists():
             try:
-                self.download_file(self.MULTIWOZ_URL, zip_path)
+                self.download_file(
+                    self.MULTIWOZ_URL, zip_path, self.MULTIWOZ_SHA256)
             except Exception as e:
                 logger.error(f"Failed to download from official URL: {e}")
                 logger.info("Attempting alternative download method...")
@@ -71,6 +394,7 @@ class MultiWOZDownloader:
 
         # Extract
         self.extract_zip(zip_path, extract_dir)
+        self._convert_to_parquet(extract_dir)
 
         # Clean up zip file
         if zip_path.exists():
@@ -79,6 +403,30 @@ class MultiWOZDownloader:
 
         return extract_dir
 
+    def _convert_to_parquet(self, dataset_dir: Path) -> None:
+        """Write a zstd Parquet copy next to every dialogue JSON file"""
+        with os.scandir(dataset_dir) as entries:
+            split_dirs = [entry.path for entry in entries
+                          if entry.is_dir(follow_symlinks=False)]
+        json_paths = [path for split_dir in split_dirs
+                      for path in _scan_dialogue_files(split_dir)]
+        for json_path in sorted(json_paths):
+            parquet_path = json_path.with_suffix(".parquet")
+            tmp_path = parquet_path.with_name(parquet_path.name + ".part")
+            try:
+                table = pa.Table.from_pylist(_load_json(json_path))
+                pq.write_table(table, tmp_path, compression="zstd")
+                os.replace(tmp_path, parquet_path)
+            except (pa.ArrowException, ValueError, TypeError, IOError) as e:
+                # A Parquet file left from an earlier run would no longer
+                # match the JSON, so verification must fall back to it
+                parquet_path.unlink(missing_ok=True)
+                logger.warning(
+                    f"Could not convert {json_path} to Parquet: {e}")
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        logger.info("Converted dialogue files to Parquet")
+
     def is_valid_dataset(self, dataset_dir: Path) -> bool:
         expected_dirs = ["train", "dev", "test"]
         for split_dir in expected_dirs:
@@ -104,25 +452,20 @@ class MultiWOZDownloader:
                 'test': 'test'
             }
 
-            for hf_split, local_split in split_mapping.items():
-                split_data = dataset[hf_split]
-
+            split_dirs = []
+            for local_split in split_mapping.values():
                 # Create split directory
                 split_dir = output_dir / local_split
                 split_dir.mkdir(exist_ok=True)
+                split_dirs.append(split_dir)
 
-                # Convert to list of dicts
-                conversations = []
-                for item in split_data:
-                    conversations.append(dict(item))
-
-                # Save as dialogues_001.json
-                output_file = split_dir / "dialogues_001.json"
-                with open(output_file, 'w') as f:
-                    json.dump(conversations, f, indent=2)
-
-                logger.info(
-                    f"Saved {len(conversations)} conversations to {output_file}")
+            # Memory-mapped Arrow splits pickle by reference, so each worker
+            # exports its split without copying the data
+            with ProcessPoolExecutor(max_workers=len(split_mapping)) as executor:
+                list(executor.map(
+                    _dump_split,
+                    [dataset[hf_split] for hf_split in split_mapping],
+                    split_dirs))
 
             logger.info(
                 "MultiWOZ dataset downloaded successfully from HuggingFace")
@@ -131,6 +474,82 @@ class MultiWOZDownloader:
             logger.error(f"Failed to download from HuggingFace: {e}")
             raise
 
+    def _sample_dialogue_file(self, path: Path) -> Tuple[int, List[str]]:
+        """Count conversations in a dialogue file and sample the first one's services"""
+        parquet_path = path.with_suffix(".parquet")
+        if parquet_path.exists():
+            # Row count comes from the footer, services from a single column
+            parquet_file = pq.ParquetFile(parquet_path)
+            services = []
+            if (parquet_file.metadata.num_row_groups
+                    and "services" in parquet_file.schema_arrow.names):
+                column = parquet_file.read_row_group(
+                    0, columns=["services"]).column(0)
+                services = column[0].as_py() or []
+            return parquet_file.metadata.num_rows, services
+
+        # Parse and validate in one pass without building turn objects,
+        # decoding straight from the page cache instead of a bytes copy
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise msgspec.DecodeError("Empty dialogue file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                dialogues = _DIALOGUE_SUMMARY_DECODER.decode(mm)
+        # Sample services from first conversation
+        services = dialogues[0].services if dialogues else []
+        return len(dialogues), services
+
+    def _sample_dialogue_files(self, dataset_dir: Path, paths: List[Path]) -> Dict[str, Any]:
+        """Sample dialogue files, reusing the sidecar cache while they are unchanged"""
+        fingerprint = {}
+        for path in paths:
+            for candidate in (path, path.with_suffix(".parquet")):
+                if candidate.exists():
+                    stat = candidate.stat()
+                    fingerprint[str(candidate.relative_to(dataset_dir))] = [
+                        stat.st_mtime_ns, stat.st_size]
+
+        cache_path = dataset_dir / self.VERIFY_CACHE
+        if cache_path.exists():
+            try:
+                cached = _load_json(cache_path)
+                if cached.get("fingerprint") == fingerprint:
+                    logger.info(f"Using cached verification from {cache_path}")
+                    return cached["stats"]
+            except (ValueError, IOError, KeyError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable cache {cache_path}: {e}")
+
+        # Parquet samples read only the footer and one column, leave those
+        # reads to pyarrow instead of pulling the whole file into cache
+        _prefetch([path for path in paths
+                   if not path.with_suffix(".parquet").exists()])
+
+        sample_stats = {"total_conversations": 0, "sample_services": set()}
+        complete = True
+        for path in paths:
+            try:
+                count, services = self._sample_dialogue_file(path)
+                sample_stats["total_conversations"] += count
+                sample_stats["sample_services"].update(services)
+            except (msgspec.DecodeError, pa.ArrowException, IOError) as e:
+                logger.warning(f"Could not read {path}: {e}")
+                complete = False
+
+        # Convert set to list for JSON serialization
+        sample_stats["sample_services"] = list(sample_stats["sample_services"])
+
+        # Only cache results that covered every sampled file
+        if complete:
+            try:
+                _dump_json({"fingerprint": fingerprint,
+                           "stats": sample_stats}, cache_path)
+            except IOError as e:
+                logger.warning(f"Could not write cache {cache_path}: {e}")
+
+        return sample_stats
+
     def verify_dataset(self, dataset_dir: Path) -> Dict[str, Any]:
         """Verify downloaded dataset structure and contents"""
         logger.info("Verifying dataset...")
@@ -141,8 +560,9 @@ class MultiWOZDownloader:
             "splits_found": [],
             "has_dialog_acts": False,
             "has_schema": False,
-            "sample_services": set()
+            "sample_services": []
         }
+        sample_files = []
 
         # Check for expected splits
         expected_splits = ["train", "dev", "test"]
@@ -152,34 +572,24 @@ class MultiWOZDownloader:
                 stats["splits_found"].append(split)
 
                 # Count dialogue files
-                dialogue_files = list(split_dir.glob("dialogues_*.json"))
+                dialogue_files = sorted(_scan_dialogue_files(split_dir))
                 stats["total_dialogue_files"] += len(dialogue_files)
 
                 # Sample first file to count conversations
                 if dialogue_files:
-                    try:
-                        with open(dialogue_files[0], 'r') as f:
-                            data = json.load(f)
-                            if isinstance(data, list):
-                                stats["total_conversations"] += len(data)
-                                # Sample services from first conversation
-                                if data and "services" in data[0]:
-                                    stats["sample_services"].update(
-                                        data[0]["services"])
-                    except (json.JSONDecodeError, IOError, KeyError) as e:
-                        logger.warning(
-                            f"Could not read {dialogue_files[0]}: {e}")
+                    sample_files.append(dialogue_files[0])
 
                 logger.info(
                     f"Found {len(dialogue_files)} dialogue file(s) in {split}/")
 
+        sample_stats = self._sample_dialogue_files(dataset_dir, sample_files)
+        stats["total_conversations"] = sample_stats["total_conversations"]
+        stats["sample_services"] = sample_stats["sample_services"]
+
         # Check for additional files
         stats["has_dialog_acts"] = (dataset_dir / "dialog_acts.json").exists()
         stats["has_schema"] = (dataset_dir / "schema.json").exists()
 
-        # Convert set to list for JSON serialization
-        stats["sample_services"] = list(stats["sample_services"])
-
         logger.info(f"Dataset verification complete:")
         logger.info(f"  Splits found: {stats['splits_found']}")
         logger.info(f"  Total dialogue files: {stats['total_dialogue_files']}")
@@ -195,13 +605,12 @@ class MultiWOZDownloader:
 def main():
     logger.info("MultiWOZ 2.2 Dataset Downloader")
 
-    downloader = MultiWOZDownloader()
-
-    # Download dataset
-    dataset_dir = downloader.download_multiwoz()
+    with MultiWOZDownloader() as downloader:
+        # Download dataset
+        dataset_dir = downloader.download_multiwoz()
 
-    # Verify dataset
-    stats = downloader.verify_dataset(dataset_dir)
+        # Verify dataset
+        stats = downloader.verify_dataset(dataset_dir)
     logger.info(" MultiWOZ dataset ready!")
     logger.info(f"Dataset location: {dataset_dir}")
 
@@ -1,11 +1,23 @@
 # defining how conversation data is structured and validated
 
+import msgspec
+import ahocorasick
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from functools import reduce
 from datetime import datetime
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 
-class Turn(BaseModel):
+# shared model config: records are immutable once validated and unknown keys are dropped
+class _SchemaModel(BaseModel):
+    model_config = ConfigDict(
+        frozen=True, extra="ignore", populate_by_name=True)
+
+
+class Turn(_SchemaModel):
     turn_id: int = Field(..., description="Turn index(0-indexed)")
     speaker: str = Field(...,
                          description="Speaker role (agent/customer/system)")  # e.g., 'agent', 'customer', 'system'
@@ -32,7 +44,7 @@ class Turn(BaseModel):
 
 
 # event detection labels
-class EventLabel(BaseModel):
+class EventLabel(_SchemaModel):
     event_type: str = Field(...,
                             description="Event type (escalation/refund/churn/etc)")  # e.g., 'escalation', 'refund', 'churn'
     confidence: float = Field(
@@ -44,7 +56,7 @@ class EventLabel(BaseModel):
 
 
 # evidence span annotations
-class EvidenceSpanAnnotation(BaseModel):
+class EvidenceSpanAnnotation(_SchemaModel):
     # e.g., turn index
     turn_id: int = Field(..., description="Turn containing the evidence")
     # e.g., start character index of the evidence span
@@ -61,7 +73,7 @@ class EvidenceSpanAnnotation(BaseModel):
 # normalizing conversation object
 
 
-class Conversation(BaseModel):
+class Conversation(_SchemaModel):
     conversation_id: str = Field(..., description="Unique conversation ID")
     turns: List[Turn] = Field(..., description="List of conversation turns")
 
@@ -101,15 +113,133 @@ class Conversation(BaseModel):
 
 
 # batch of conversations
-class ConversationBatch(BaseModel):
+class ConversationBatch(_SchemaModel):
     conversations: List[Conversation] = Field(
         ..., description="List of conversations")
     metadata: Dict[str, Any] = Field(
         default_factory=dict, description="Batch metadata")
 
 
+# list validator built once and reused for every batch
+_BATCH_ADAPTER = TypeAdapter(List[Conversation])
+
+
+def parse_batch(raw: List[Dict[str, Any]]) -> List[Conversation]:
+    return _BATCH_ADAPTER.validate_python(raw)
+
+
+def parse_batch_bytes(data: bytes) -> List[Conversation]:
+    """Validate a JSON array of conversations straight from bytes"""
+    return _BATCH_ADAPTER.validate_json(data)
+
+
+# default speaker codes for columnar turns, unseen speakers are appended per conversation
+SPEAKER_CODES = ("system", "user", "agent")
+
+# nested turn fields that stay as per-turn dicts in the columnar layout
+_NESTED_TURN_FIELDS = {"metadata", "span_info", "frames", "slots"}
+
+
+# struct-of-arrays layout of a conversation's turns
+class ConversationColumnar(msgspec.Struct):
+    """Columnar turns of a Conversation, see to_columnar/to_object"""
+    header: Conversation  # conversation-level fields with turns left empty
+    speaker_labels: Tuple[str, ...]
+    speakers: np.ndarray  # uint8 index into speaker_labels per turn
+    turn_ids: np.ndarray  # int32 per turn
+    utterance_text: bytes  # UTF-8 utterances concatenated
+    utterance_offsets: np.ndarray  # int32 byte offsets, n_turns + 1
+    times: np.ndarray  # float64 (n_turns, 3) timestamp/start/end, NaN when unset
+    dialog_act_offsets: np.ndarray  # int32 CSR offsets into dialog act rows, n_turns + 1
+    dialog_act_types: List[str]  # act name per dialog act row
+    dialog_act_args: List[List[str]]  # act arguments per dialog act row
+    turn_annotations: Dict[int, Dict[str, Any]]  # non-default nested fields by turn index
+
+
+def to_columnar(conversation: Conversation) -> ConversationColumnar:
+    turns = conversation.turns
+    speaker_labels = list(SPEAKER_CODES)
+    speaker_index = {label: code for code, label in enumerate(speaker_labels)}
+    speakers = np.empty(len(turns), dtype=np.uint8)
+    times = np.full((len(turns), 3), np.nan)
+    texts = []
+    act_offsets = [0]
+    act_types: List[str] = []
+    act_args: List[List[str]] = []
+    annotations: Dict[int, Dict[str, Any]] = {}
+
+    for i, turn in enumerate(turns):
+        if turn.speaker not in speaker_index:
+            speaker_index[turn.speaker] = len(speaker_labels)
+            speaker_labels.append(turn.speaker)
+        speakers[i] = speaker_index[turn.speaker]
+        texts.append(turn.text.encode("utf-8"))
+        for j, value in enumerate((turn.timestamp, turn.start_time, turn.end_time)):
+            if value is not None:
+                times[i, j] = value
+
+        annotation = turn.model_dump(
+            include=_NESTED_TURN_FIELDS, exclude_defaults=True)
+        # Acts with no rows cannot be told apart from missing ones in CSR form
+        if turn.dialog_acts and all(turn.dialog_acts.values()):
+            for act_type, rows in turn.dialog_acts.items():
+                act_types.extend([act_type] * len(rows))
+                act_args.extend(rows)
+        elif turn.dialog_acts is not None:
+            annotation["dialog_acts"] = turn.dialog_acts
+        act_offsets.append(len(act_types))
+        if annotation:
+            annotations[i] = annotation
+
+    utterance_offsets = np.zeros(len(turns) + 1, dtype=np.int32)
+    np.cumsum([len(text) for text in texts], out=utterance_offsets[1:])
+
+    return ConversationColumnar(
+        header=conversation.model_copy(update={"turns": []}),
+        speaker_labels=tuple(speaker_labels),
+        speakers=speakers,
+        turn_ids=np.array([turn.turn_id for turn in turns], dtype=np.int32),
+        utterance_text=b"".join(texts),
+        utterance_offsets=utterance_offsets,
+        times=times,
+        dialog_act_offsets=np.array(act_offsets, dtype=np.int32),
+        dialog_act_types=act_types,
+        dialog_act_args=act_args,
+        turn_annotations=annotations,
+    )
+
+
+def to_object(columnar: ConversationColumnar) -> Conversation:
+    turns = []
+    text_offsets = columnar.utterance_offsets.tolist()
+    act_offsets = columnar.dialog_act_offsets.tolist()
+    for i, turn_id in enumerate(columnar.turn_ids.tolist()):
+        annotation = dict(columnar.turn_annotations.get(i, {}))
+        if act_offsets[i] != act_offsets[i + 1]:
+            dialog_acts: Dict[str, List[List[str]]] = {}
+            for row in range(act_offsets[i], act_offsets[i + 1]):
+                dialog_acts.setdefault(columnar.dialog_act_types[row], []).append(
+                    columnar.dialog_act_args[row])
+            annotation["dialog_acts"] = dialog_acts
+        timestamp, start_time, end_time = (
+            None if np.isnan(value) else value
+            for value in columnar.times[i].tolist())
+
+        turns.append(Turn(
+            turn_id=turn_id,
+            speaker=columnar.speaker_labels[columnar.speakers[i]],
+            text=columnar.utterance_text[
+                text_offsets[i]:text_offsets[i + 1]].decode("utf-8"),
+            timestamp=timestamp,
+            start_time=start_time,
+            end_time=end_time,
+            **annotation,
+        ))
+    return columnar.header.model_copy(update={"turns": turns})
+
+
 # Annotation guidelines for labeling
-class AnnotationGuideline(BaseModel):
+class AnnotationGuideline(_SchemaModel):
     """Annotation guidelines for labeling"""
     event_type: str = Field(..., description="Event type to annotate")
     description: str = Field(..., description="Event description")
@@ -245,3 +375,40 @@ EVENT_GUIDELINES = {
         ]
     )
 }
+
+
+# single automaton over all example phrases, so matching is one pass per utterance
+def _build_event_automaton() -> ahocorasick.Automaton:
+    phrases: Dict[str, List[Tuple[str, str]]] = {}
+    for event_type, guideline in EVENT_GUIDELINES.items():
+        for example in guideline.examples:
+            phrases.setdefault(example.lower(), []).append(
+                (event_type, example))
+
+    automaton = ahocorasick.Automaton()
+    for phrase, matches in phrases.items():
+        automaton.add_word(phrase, matches)
+    automaton.make_automaton()
+    return automaton
+
+
+_EVENT_AUTOMATON = _build_event_automaton()
+
+
+def match_events(text: str) -> List[Tuple[str, str]]:
+    """Return (event_type, example phrase) pairs found in text, case-insensitive"""
+    return [match
+            for _, matches in _EVENT_AUTOMATON.iter(text.lower())
+            for match in matches]
+
+
+def match_event_masks(utterances: Union[pa.Array, pa.ChunkedArray]) -> Dict[str, pa.Array]:
+    """Boolean mask per event type over an Arrow string column of utterances"""
+    masks = {}
+    for event_type, guideline in EVENT_GUIDELINES.items():
+        mask = reduce(pc.or_, (
+            pc.match_substring(utterances, example, ignore_case=True)
+            for example in guideline.examples))
+        # Null utterances never match
+        masks[event_type] = pc.fill_null(mask, False)
+    return masks
@@ -1,10 +1,9 @@
-import json
+import ijson
 
-with open('../data/raw/multiwoz_2.2/train/dialogues_001.json', 'r') as f:
-    data = json.load(f)
+# Check first conversation, parsing only as far as its closing brace
+with open('../data/raw/multiwoz_2.2/train/dialogues_001.json', 'rb') as f:
+    first_conv = next(ijson.items(f, 'item'))
 
-# Check first conversation
-first_conv = data[0]
 print(f"Conversation ID: {first_conv.get('dialogue_id')}")
 print(f"Services: {first_conv.get('services')}")
 
@@ -28,7 +27,6 @@ if 'turn_id' in turns:
                 print(
                     f"First frame keys: {turns['frames'][0][0].keys() if turns['frames'][0] else 'empty'}")
 
-first_conv = data[0]
 turns = first_conv['turns']
 
 print("Detailed structure check:")